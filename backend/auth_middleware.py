@@ -1,17 +1,27 @@
 """Authentication and multi-tenant middleware for the council API."""
 
+import asyncio
 import logging
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from functools import wraps
 from fastapi import HTTPException, Header, Request
 import hashlib
+import hmac
 import json
 
 logger = logging.getLogger(__name__)
 
+# Role used when neither the user nor the tenant document names one
+DEFAULT_USER_ROLE = "clinician"
+
 from domain_config import HealthcareDomainConfig
-from firebase_service import firebase_service
+from firebase_service import get_firebase_service
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash an API key; the hex digest is what user documents store as api_key_hash."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
 
 
 class TenantContext:
@@ -54,7 +64,7 @@ class AuthMiddleware:
         """Verify API key and return tenant info."""
         try:
             # Hash the API key for security
-            key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+            key_hash = hash_api_key(api_key)
             
             # Check cache first
             if key_hash in self.token_cache:
@@ -62,21 +72,32 @@ class AuthMiddleware:
                 if cached["expires_at"] > datetime.utcnow():
                     return cached["data"]
             
-            # Verify via Firebase (would be implemented)
-            # For now, accept API key format: "sk-chairmancouncil-{tenant_id}-{user_id}"
+            # Key format: "sk-chairmancouncil-{tenant_id}-{user_id}-{secret}".
+            # The ids only locate the user; the key is accepted only if its
+            # hash matches api_key_hash on tenants/{tenant_id}/users/{user_id}
             if api_key.startswith("sk-chairmancouncil-"):
                 parts = api_key.split("-")
-                if len(parts) >= 4:
+                if len(parts) >= 5:
                     tenant_id = parts[2]
                     user_id = parts[3]
                     
+                    user_config = get_firebase_service().get_user_config(tenant_id, user_id)
+                    if not user_config or not hmac.compare_digest(
+                        user_config.get("api_key_hash", ""), key_hash
+                    ):
+                        return None
+                    
                     # Get tenant config from Firebase
-                    tenant_config = firebase_service.get_tenant_config(tenant_id)
+                    tenant_config = get_firebase_service().get_tenant_config(tenant_id)
                     
                     if tenant_config:
                         data = {
                             "tenant_id": tenant_id,
                             "user_id": user_id,
+                            "user_role": (
+                                user_config.get("role")
+                                or tenant_config.get("default_role", DEFAULT_USER_ROLE)
+                            ),
                             "tenant_name": tenant_config.get("organization_name", "Unknown"),
                             "specialty": tenant_config.get("specialty", "healthcare")
                         }
@@ -94,8 +115,8 @@ class AuthMiddleware:
             logger.error(f"Error verifying API key: {e}")
             return None
 
-    def create_tenant_context(self, api_key: str, user_role: str = "clinician") -> Optional[TenantContext]:
-        """Create a tenant context from API key."""
+    def create_tenant_context(self, api_key: str, user_role: Optional[str] = None) -> Optional[TenantContext]:
+        """Create a tenant context from API key, using the caller's stored role unless overridden."""
         verified = self.verify_api_key(api_key)
         if not verified:
             return None
@@ -103,7 +124,7 @@ class AuthMiddleware:
         return TenantContext(
             tenant_id=verified["tenant_id"],
             user_id=verified["user_id"],
-            user_role=user_role
+            user_role=user_role or verified["user_role"]
         )
 
 
@@ -139,6 +160,27 @@ auth_middleware = AuthMiddleware()
 rate_limiter = RateLimiter()
 
 
+def resolve_tenant_context(authorization: Optional[str]) -> Optional[TenantContext]:
+    """Resolve an Authorization header to a tenant context.
+
+    Returns None when no header is sent; raises 401 for an invalid key.
+    """
+    if not authorization:
+        return None
+    
+    # Extract API key from "Bearer {key}" format
+    parts = authorization.split(" ")
+    if len(parts) == 2 and parts[0].lower() == "bearer":
+        api_key = parts[1]
+    else:
+        api_key = authorization
+    
+    tenant_context = auth_middleware.create_tenant_context(api_key)
+    if not tenant_context:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    return tenant_context
+
+
 def require_auth(func):
     """Decorator to require authentication for endpoints."""
     @wraps(func)
@@ -146,25 +188,14 @@ def require_auth(func):
         if not authorization:
             raise HTTPException(status_code=401, detail="Missing API key")
         
-        # Extract API key from "Bearer {key}" format
-        try:
-            parts = authorization.split(" ")
-            if len(parts) == 2 and parts[0].lower() == "bearer":
-                api_key = parts[1]
-            else:
-                api_key = authorization
-        except:
-            raise HTTPException(status_code=401, detail="Invalid authorization format")
-        
-        # Verify API key
-        tenant_info = auth_middleware.verify_api_key(api_key)
-        if not tenant_info:
-            raise HTTPException(status_code=401, detail="Invalid API key")
+        # Key verification reads Firestore (and may initialize it); keep
+        # that blocking work off the event loop
+        tenant_context = await asyncio.to_thread(resolve_tenant_context, authorization)
         
         # Store in request state for use in endpoint
-        request.state.tenant_id = tenant_info["tenant_id"]
-        request.state.user_id = tenant_info["user_id"]
-        request.state.tenant_context = auth_middleware.create_tenant_context(api_key)
+        request.state.tenant_id = tenant_context.tenant_id
+        request.state.user_id = tenant_context.user_id
+        request.state.tenant_context = tenant_context
         
         return await func(request, *args, **kwargs)
     
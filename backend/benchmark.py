@@ -0,0 +1,100 @@
+"""Benchmark harness for the council query endpoint.
+
+Runs council queries through the ASGI app against a mocked OpenRouter and
+reports latency and per-request memory (via tracemalloc).
+
+Usage: python benchmark.py [--requests N] [--concurrency N] [--response-tokens N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List
+
+import httpx
+
+import main
+
+
+def mock_openrouter(response_tokens: int) -> httpx.MockTransport:
+    """Build a transport that answers chat completions with a fixed-size body."""
+    content = "lorem ipsum " * (response_tokens // 2)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 200, "completion_tokens": response_tokens,
+                      "total_tokens": 200 + response_tokens},
+        })
+
+    return httpx.MockTransport(handler)
+
+
+async def run_query(client: httpx.AsyncClient, index: int) -> float:
+    """Send one council query and return its latency in milliseconds."""
+    started = time.perf_counter()
+    response = await client.post("/api/council/query", json={"query": f"Benchmark query {index}"})
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_benchmark(requests: int, concurrency: int, response_tokens: int) -> Dict[str, float]:
+    """Run the benchmark and return summary metrics."""
+    # Install the mocked client as the app's shared upstream client, so no
+    # request can reach the real OpenRouter
+    main._http_client = httpx.AsyncClient(transport=mock_openrouter(response_tokens))
+    app_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench")
+    try:
+        async with app_client:
+            await run_query(app_client, -1)  # warm-up
+
+            # Sequential pass: peak traced memory attributable to a single request
+            per_request_peaks: List[int] = []
+            latencies: List[float] = []
+            tracemalloc.start()
+            for i in range(requests):
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                latencies.append(await run_query(app_client, i))
+                _, peak = tracemalloc.get_traced_memory()
+                per_request_peaks.append(peak - baseline)
+
+            # Concurrent pass: peak traced memory with requests in flight together
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(i: int) -> float:
+                async with semaphore:
+                    return await run_query(app_client, i)
+
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await asyncio.gather(*(bounded(i) for i in range(requests)))
+            _, concurrent_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        await main._http_client.aclose()
+        main._http_client = None
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "latency_p50_ms": statistics.median(latencies),
+        "latency_max_ms": max(latencies),
+        "request_peak_kb_p50": statistics.median(per_request_peaks) / 1024,
+        "request_peak_kb_max": max(per_request_peaks) / 1024,
+        "concurrent_peak_kb": (concurrent_peak - baseline) / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--response-tokens", type=int, default=main.settings.max_tokens_per_response)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.requests, args.concurrency, args.response_tokens))
+    for name, value in results.items():
+        print(f"{name:>22}: {value:,.1f}" if isinstance(value, float) else f"{name:>22}: {value}")
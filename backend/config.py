@@ -1,6 +1,12 @@
 import os
 from typing import List
 
+# Local development reads .env; Cloud Run (K_SERVICE set) injects env vars
+# directly, so skip the file lookup on cold start
+if not os.getenv("K_SERVICE"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID", "mindly-chairmans-council")
@@ -15,8 +21,18 @@ COUNCIL_MODELS: List[str] = [
 CHAIRMAN_MODEL = "google/gemini-2.0-flash"
 
 MAX_TOKENS_PER_RESPONSE = 2000
+# Upstream body caps: successful completions are rejected past the first,
+# error bodies are truncated to the second
+MAX_UPSTREAM_RESPONSE_BYTES = int(os.getenv("MAX_UPSTREAM_RESPONSE_BYTES", str(256 * 1024)))
+MAX_ERROR_BODY_BYTES = int(os.getenv("MAX_ERROR_BODY_BYTES", "2048"))
 COUNCIL_TIMEOUT_SECONDS = 120
 CHAIRMAN_TIMEOUT_SECONDS = 90
+# Upstream calls allowed in flight per worker; extra calls queue by priority
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+# Mean pairwise agreement (0-1) at or above which the council counts as in
+# strong consensus; synthesis is only skipped on it when explicitly enabled
+CONSENSUS_SKIP_SYNTHESIS = os.getenv("CONSENSUS_SKIP_SYNTHESIS", "false").lower() == "true"
+CONSENSUS_SKIP_SYNTHESIS_THRESHOLD = float(os.getenv("CONSENSUS_SKIP_SYNTHESIS_THRESHOLD", "0.6"))
 
 DOMAIN = "healthcare"
 USE_HEALTHCARE_PROMPTS = True
@@ -34,8 +50,13 @@ class Settings:
     council_models = COUNCIL_MODELS
     chairman_model = CHAIRMAN_MODEL
     max_tokens_per_response = MAX_TOKENS_PER_RESPONSE
+    max_upstream_response_bytes = MAX_UPSTREAM_RESPONSE_BYTES
+    max_error_body_bytes = MAX_ERROR_BODY_BYTES
     council_timeout_seconds = COUNCIL_TIMEOUT_SECONDS
     chairman_timeout_seconds = CHAIRMAN_TIMEOUT_SECONDS
+    upstream_max_concurrency = UPSTREAM_MAX_CONCURRENCY
+    consensus_skip_synthesis = CONSENSUS_SKIP_SYNTHESIS
+    consensus_skip_synthesis_threshold = CONSENSUS_SKIP_SYNTHESIS_THRESHOLD
     domain = DOMAIN
     use_healthcare_prompts = USE_HEALTHCARE_PROMPTS
     clinical_context = CLINICAL_CONTEXT
@@ -0,0 +1,168 @@
+"""Local consensus and disagreement analysis over council member opinions.
+
+Scores agreement between members with TF-IDF cosine similarity so the
+Stage 1 response can report consensus immediately, and builds a compact,
+structured input for the chairman instead of every member's full text.
+"""
+
+import math
+import re
+from collections import Counter
+from itertools import combinations
+from typing import Any, Dict, List
+
+from config import settings
+
+# Negations and modals are deliberately absent: "should start X" and "should
+# not start X" must not score as the same opinion
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before
+being below between both but by did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself just
+me more most my now of off on once only or other our ours out over
+own same she so some such than that the their theirs them then there these they this
+those through to too under until up very via was we were what when where which while who
+whom why with you your yours
+""".split())
+
+NEGATIONS = frozenset(["no", "not", "nor", "never", "cannot", "without", "against", "avoid"])
+
+CLAUSE_PATTERN = re.compile(r"[.,;:!?\n]+")
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9\-']*")
+RECOMMENDATION_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+)$")
+RECOMMENDATION_KEYWORDS = ("recommend", "should", "must", "propose", "suggest")
+
+MAX_RECOMMENDATIONS_PER_MEMBER = 5
+MAX_CONSENSUS_TERMS = 10
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stop words removed and negation marked.
+
+    After a negation ("not", "don't", "avoid", ...) the remaining words of the
+    clause are prefixed with "not_", so "do not recommend sertraline" shares
+    no recommendation terms with "recommend sertraline".
+    """
+    tokens = []
+    for clause in CLAUSE_PATTERN.split(text.lower()):
+        negated = False
+        for word in WORD_PATTERN.findall(clause):
+            if word in NEGATIONS or word.endswith("n't"):
+                negated = True
+                tokens.append("not")
+            elif len(word) >= 3 and word not in STOP_WORDS:
+                tokens.append(f"not_{word}" if negated else word)
+    return tokens
+
+
+def tfidf_vectors(documents: List[List[str]]) -> List[Dict[str, float]]:
+    """Build L2-normalised sparse TF-IDF vectors for tokenised documents."""
+    document_frequency = Counter(term for tokens in documents for term in set(tokens))
+    count = len(documents)
+    vectors = []
+    for tokens in documents:
+        term_frequency = Counter(tokens)
+        # Smoothed idf, so terms every member uses still carry some weight
+        vector = {
+            term: tf * (math.log((1 + count) / (1 + document_frequency[term])) + 1)
+            for term, tf in term_frequency.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({term: weight / norm for term, weight in vector.items()} if norm else {})
+    return vectors
+
+
+def cosine_similarity(left: Dict[str, float], right: Dict[str, float]) -> float:
+    """Cosine similarity of two normalised sparse vectors."""
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(term, 0.0) for term, weight in left.items())
+
+
+def extract_recommendations(text: str) -> List[str]:
+    """Pull list items and recommendation sentences out of a member response."""
+    recommendations = []
+    for line in text.splitlines():
+        match = RECOMMENDATION_PATTERN.match(line)
+        item = match.group(1).strip() if match else line.strip()
+        if match or any(keyword in item.lower() for keyword in RECOMMENDATION_KEYWORDS):
+            if item:
+                recommendations.append(item.strip("*_ "))
+        if len(recommendations) >= MAX_RECOMMENDATIONS_PER_MEMBER:
+            break
+    return recommendations
+
+
+def analyze_opinions(opinions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Score agreement between the members that answered successfully."""
+    answered = {
+        member_id: opinion["response"]
+        for member_id, opinion in opinions.items()
+        if opinion.get("response")
+    }
+    member_ids = list(answered)
+    failed_members = [member_id for member_id in opinions if member_id not in answered]
+    tokens = [tokenize(answered[member_id]) for member_id in member_ids]
+    vectors = tfidf_vectors(tokens)
+
+    pairwise = {}
+    member_totals = {member_id: [] for member_id in member_ids}
+    for (i, left), (j, right) in combinations(enumerate(member_ids), 2):
+        score = round(cosine_similarity(vectors[i], vectors[j]), 4)
+        pairwise[f"{left}|{right}"] = score
+        member_totals[left].append(score)
+        member_totals[right].append(score)
+
+    member_agreement = {
+        member_id: round(sum(scores) / len(scores), 4)
+        for member_id, scores in member_totals.items() if scores
+    }
+    mean_agreement = round(sum(pairwise.values()) / len(pairwise), 4) if pairwise else 0.0
+
+    # Terms every member used, ranked by combined frequency
+    shared = set.intersection(*(set(t) for t in tokens)) if tokens else set()
+    combined = Counter(term for t in tokens for term in t if term in shared)
+
+    return {
+        "members_compared": member_ids,
+        "failed_members": failed_members,
+        "pairwise_agreement": pairwise,
+        "member_agreement": member_agreement,
+        "mean_agreement": mean_agreement,
+        "most_divergent": min(member_agreement, key=member_agreement.get) if member_agreement else None,
+        "consensus_terms": [term for term, _ in combined.most_common(MAX_CONSENSUS_TERMS)],
+        "recommendations": {
+            member_id: extract_recommendations(answered[member_id]) for member_id in member_ids
+        },
+        # Agreement among a partial council is not consensus: every member
+        # must have answered before synthesis can be skipped
+        "strong_consensus": (
+            len(member_ids) >= 2
+            and not failed_members
+            and mean_agreement >= settings.consensus_skip_synthesis_threshold
+        ),
+    }
+
+
+def build_chairman_input(query: str, opinions: Dict[str, Dict[str, Any]],
+                         analysis: Dict[str, Any]) -> str:
+    """Structured chairman message: agreement scores plus each member's recommendations."""
+    lines = [
+        f"Question: {query}",
+        "",
+        f"Mean agreement across members: {analysis['mean_agreement']:.2f}",
+        f"Shared themes: {', '.join(analysis['consensus_terms']) or 'none'}",
+        f"Most divergent member: {analysis['most_divergent'] or 'n/a'}",
+        "Members without a response: " + (
+            ", ".join(opinions[member_id]["role"] for member_id in analysis["failed_members"]) or "none"
+        ),
+        "",
+        "Pairwise agreement:",
+    ]
+    lines += [f"- {pair.replace('|', ' vs ')}: {score:.2f}"
+              for pair, score in analysis["pairwise_agreement"].items()]
+
+    for member_id in analysis["members_compared"]:
+        lines += ["", f"{opinions[member_id]['role']} recommendations:"]
+        lines += [f"- {item}" for item in analysis["recommendations"][member_id]] or ["- (none extracted)"]
+    return "\n".join(lines)
@@ -1,6 +1,6 @@
 """Healthcare domain-specific configuration and prompts."""
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from enum import Enum
 
 
@@ -72,22 +72,26 @@ class HealthcareDomainConfig:
         "healthcare_admin": {
             "permissions": ["manage_users", "view_analytics", "manage_domain_config"],
             "can_access_all_patients": False,
-            "rate_limit_per_minute": 100
+            "rate_limit_per_minute": 100,
+            "priority": "normal"
         },
         "clinician": {
             "permissions": ["query_council", "view_history"],
             "can_access_all_patients": False,
-            "rate_limit_per_minute": 30
+            "rate_limit_per_minute": 30,
+            "priority": "high"
         },
         "researcher": {
             "permissions": ["query_council", "view_aggregated_analytics"],
             "can_access_all_patients": False,
-            "rate_limit_per_minute": 50
+            "rate_limit_per_minute": 50,
+            "priority": "low"
         },
         "admin": {
             "permissions": ["*"],
             "can_access_all_patients": True,
-            "rate_limit_per_minute": 1000
+            "rate_limit_per_minute": 1000,
+            "priority": "normal"
         }
     }
 
@@ -123,6 +127,11 @@ class HealthcareDomainConfig:
         """Get role-based access control configuration."""
         return HealthcareDomainConfig.TENANT_ROLES.get(role, {})
 
+    @staticmethod
+    def get_role_priority(role: str) -> Optional[str]:
+        """Get the default scheduling priority for a role, if it defines one."""
+        return HealthcareDomainConfig.TENANT_ROLES.get(role, {}).get("priority")
+
     @staticmethod
     def validate_phi_sensitivity(context: Dict[str, Any]) -> Dict[str, bool]:
         """Validate if context contains sensitive PHI."""
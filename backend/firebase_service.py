@@ -0,0 +1,255 @@
+"""Firebase Firestore service for persistence layer."""
+
+import json
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+from config import settings
+
+# Summary fields returned by history listings
+HISTORY_FIELDS = ["query", "domain", "user_id", "created_at", "chairman_reasoning"]
+
+
+class FirebaseService:
+    """Service for interacting with Firebase Firestore."""
+
+    def __init__(self):
+        """Initialize Firebase Admin SDK."""
+        self.db = None
+        # Imported here rather than at module level: firebase_admin pulls in
+        # grpc and google-cloud, which dominates cold start
+        try:
+            from firebase_admin import firestore, credentials
+            import firebase_admin
+        except ImportError:
+            logger.warning("Firebase not installed. Using mock mode.")
+            return
+            
+        try:
+            if not firebase_admin._apps:
+                if settings.firebase_credentials_path != "firebase_credentials.json":
+                    creds = credentials.Certificate(settings.firebase_credentials_path)
+                    firebase_admin.initialize_app(creds)
+                else:
+                    firebase_admin.initialize_app()
+            self.db = firestore.client()
+            logger.info("Firebase initialized successfully")
+        except Exception as e:
+            logger.warning(f"Firebase init failed: {e}. Using mock mode.")
+            self.db = None
+
+    def save_council_query(self, query: str, response: Dict[str, Any], 
+                          domain: str = "healthcare", tenant_id: str = "default",
+                          user_id: Optional[str] = None) -> str:
+        """Save a council query and response to Firestore."""
+        if not self.db:
+            logger.warning("Firestore unavailable. Skipping save.")
+            return "mock_id"
+            
+        try:
+            doc_data = {
+                "query": query,
+                "response": response,
+                "domain": domain,
+                "tenant_id": tenant_id,
+                "user_id": user_id,
+                "created_at": datetime.utcnow(),
+                "model_votes": response.get("model_votes", {}),
+                "chairman_reasoning": response.get("chairman_reasoning", ""),
+            }
+            
+            collection = f"tenants/{tenant_id}/council_queries"
+            doc_ref = self.db.collection(collection).document()
+            doc_ref.set(doc_data)
+            logger.info(f"Council query saved: {doc_ref.id}")
+            self._record_query_rollup(response, tenant_id, doc_data["created_at"])
+            return doc_ref.id
+        except Exception as e:
+            logger.error(f"Error saving council query: {e}")
+            raise
+
+    def get_council_query(self, query_id: str, tenant_id: str = "default") -> Optional[Dict]:
+        """Retrieve a council query."""
+        if not self.db:
+            return None
+            
+        try:
+            collection = f"tenants/{tenant_id}/council_queries"
+            doc = self.db.collection(collection).document(query_id).get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error retrieving council query: {e}")
+            return None
+
+    def list_council_queries(self, tenant_id: str = "default", user_id: Optional[str] = None,
+                             limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """List council queries newest first, one page at a time.
+
+        Only the summary fields in HISTORY_FIELDS are read; fetch the full
+        document with get_council_query. Filtering by user_id relies on the
+        (user_id, created_at DESC) composite index in firestore.indexes.json.
+        """
+        if not self.db:
+            return {"items": [], "next_cursor": None}
+
+        from firebase_admin import firestore
+
+        try:
+            collection = self.db.collection(f"tenants/{tenant_id}/council_queries")
+            query = collection
+            if user_id:
+                query = query.where("user_id", "==", user_id)
+            query = query.order_by("created_at", direction=firestore.Query.DESCENDING)
+            query = query.select(HISTORY_FIELDS)
+
+            if cursor:
+                cursor_doc = collection.document(cursor).get()
+                if not cursor_doc.exists:
+                    return {"items": [], "next_cursor": None}
+                query = query.start_after(cursor_doc)
+
+            # Read one extra document to know whether another page exists
+            docs = list(query.limit(limit + 1).stream())
+            items = [{"id": doc.id, **doc.to_dict()} for doc in docs[:limit]]
+            next_cursor = items[-1]["id"] if len(docs) > limit else None
+            return {"items": items, "next_cursor": next_cursor}
+        except Exception as e:
+            logger.error(f"Error listing council queries: {e}")
+            return {"items": [], "next_cursor": None}
+
+    def _record_query_rollup(self, response: Dict[str, Any], tenant_id: str,
+                             created_at: datetime) -> None:
+        """Increment the daily analytics rollup for a saved council query."""
+        from firebase_admin import firestore
+
+        day = created_at.strftime("%Y-%m-%d")
+        models: Dict[str, Dict[str, Any]] = {}
+        for opinion in response.get("council_opinions", {}).values():
+            model = opinion.get("model")
+            if not model:
+                continue
+            usage = opinion.get("usage") or {}
+            models[model] = {
+                "calls": firestore.Increment(1),
+                "errors": firestore.Increment(1 if "error" in opinion else 0),
+                "latency_ms_total": firestore.Increment(opinion.get("latency_ms", 0)),
+                "total_tokens": firestore.Increment(usage.get("total_tokens", 0)),
+                "cost_usd": firestore.Increment(usage.get("cost", 0)),
+            }
+
+        try:
+            # set(merge=True) keeps map keys literal, so model names containing
+            # dots or slashes are safe, and creates the day's document on demand
+            self.db.collection(f"tenants/{tenant_id}/analytics_daily").document(day).set({
+                "date": day,
+                "query_count": firestore.Increment(1),
+                "models": models,
+                "updated_at": datetime.utcnow(),
+            }, merge=True)
+        except Exception as e:
+            # Analytics must never fail the query save itself
+            logger.error(f"Error updating analytics rollup: {e}")
+
+    def get_query_analytics(self, tenant_id: str = "default", start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> List[Dict]:
+        """Get daily analytics rollups (YYYY-MM-DD bounds, inclusive)."""
+        if not self.db:
+            return []
+
+        try:
+            query = self.db.collection(f"tenants/{tenant_id}/analytics_daily")
+            if start_date:
+                query = query.where("date", ">=", start_date)
+            if end_date:
+                query = query.where("date", "<=", end_date)
+            query = query.order_by("date")
+
+            days = []
+            for doc in query.stream():
+                day = doc.to_dict()
+                for stats in day.get("models", {}).values():
+                    calls = stats.get("calls", 0)
+                    stats["avg_latency_ms"] = stats.get("latency_ms_total", 0) / calls if calls else 0
+                    stats["error_rate"] = stats.get("errors", 0) / calls if calls else 0
+                days.append(day)
+            return days
+        except Exception as e:
+            logger.error(f"Error retrieving query analytics: {e}")
+            return []
+
+    def save_healthcare_context(self, context: Dict[str, Any], 
+                               tenant_id: str = "default") -> str:
+        """Save healthcare context and patient information."""
+        if not self.db:
+            return "mock_id"
+            
+        try:
+            context["created_at"] = datetime.utcnow()
+            context["tenant_id"] = tenant_id
+            
+            collection = f"tenants/{tenant_id}/healthcare_contexts"
+            doc_ref = self.db.collection(collection).document()
+            doc_ref.set(context)
+            logger.info(f"Healthcare context saved: {doc_ref.id}")
+            return doc_ref.id
+        except Exception as e:
+            logger.error(f"Error saving healthcare context: {e}")
+            raise
+
+    def create_tenant(self, tenant_id: str, tenant_config: Dict[str, Any]) -> None:
+        """Create a new tenant."""
+        if not self.db:
+            logger.warning("Firestore unavailable. Skipping tenant creation.")
+            return
+            
+        try:
+            tenant_config["created_at"] = datetime.utcnow()
+            tenant_config["status"] = "active"
+            self.db.collection("tenants").document(tenant_id).set(tenant_config)
+            logger.info(f"Tenant created: {tenant_id}")
+        except Exception as e:
+            logger.error(f"Error creating tenant: {e}")
+            raise
+
+    def get_tenant_config(self, tenant_id: str) -> Optional[Dict]:
+        """Get tenant configuration."""
+        if not self.db:
+            return None
+            
+        try:
+            doc = self.db.collection("tenants").document(tenant_id).get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error retrieving tenant config: {e}")
+            return None
+
+    def get_user_config(self, tenant_id: str, user_id: str) -> Optional[Dict]:
+        """Get a tenant user's configuration (including their role)."""
+        if not self.db:
+            return None
+            
+        try:
+            doc = self.db.collection(f"tenants/{tenant_id}/users").document(user_id).get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error retrieving user config: {e}")
+            return None
+
+
+# Global Firebase service instance, created on first use
+_firebase_service: Optional[FirebaseService] = None
+_firebase_service_lock = threading.Lock()
+
+
+def get_firebase_service() -> FirebaseService:
+    """Get the shared Firebase service, initializing it on first call."""
+    global _firebase_service
+    if _firebase_service is None:
+        with _firebase_service_lock:
+            if _firebase_service is None:
+                _firebase_service = FirebaseService()
+    return _firebase_service
\ No newline at end of file
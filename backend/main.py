@@ -2,9 +2,8 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
 import httpx
 from config import settings
 from healthcare_prompts import (
@@ -14,27 +13,24 @@ from healthcare_prompts import (
     INNOVATION_LEAD_SYSTEM_PROMPT,
     CHAIRMAN_SYNTHESIS_PROMPT,
 )
+from consensus import analyze_opinions, build_chairman_input
+from domain_config import HealthcareDomainConfig
+from scheduler import DeadlineExceeded, PriorityScheduler, parse_priority, remaining_seconds, resolve_priority
+from serialization import DefaultJSONResponse, json_loads
+from firebase_service import get_firebase_service
+from auth_middleware import require_auth, require_permission, resolve_tenant_context
+import asyncio
 import json
-from typing import Dict, List
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
 import uuid
 from datetime import datetime
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-app = FastAPI(
-    title="Mindly Chairman's Council",
-    description="Multi-model AI advisory council for Mindly Health",
-    version="1.0.0"
-)
-
-# Enable CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+router = APIRouter()
 
 # Council member configurations
 COUNCIL_MEMBERS = {
@@ -60,58 +56,213 @@ COUNCIL_MEMBERS = {
     },
 }
 
-@app.get("/health")
+# Shared upstream HTTP client, created on first use so startup stays cheap
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first call"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient()
+    return _http_client
+
+# Priority scheduler for upstream calls, created on first use inside the event loop
+_scheduler: Optional[PriorityScheduler] = None
+
+def get_scheduler() -> PriorityScheduler:
+    """Get the shared upstream scheduler, creating it on first call"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PriorityScheduler(settings.upstream_max_concurrency)
+    return _scheduler
+
+@router.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness check - never touches downstream services"""
     return {
         "status": "healthy",
         "service": "Mindly Chairman's Council",
         "timestamp": datetime.utcnow().isoformat()
     }
 
-@app.post("/api/council/query")
-async def council_query(request: Dict):
-    """Query the council for advice"""
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness check - initializes lazy services and reports their state"""
+    firebase_service = await asyncio.to_thread(get_firebase_service)
+    get_http_client()
+    checks = {
+        "openrouter_configured": bool(settings.openrouter_api_key),
+        "firestore": "connected" if firebase_service.db else "mock",
+    }
+    ready = checks["openrouter_configured"]
+    return DefaultJSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+    )
+
+@router.post("/api/council/query")
+async def council_query(
+    request: Dict,
+    x_council_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[int] = Header(None),
+    authorization: Optional[str] = Header(None),
+):
+    """Query the council for advice
+
+    X-Council-Priority (high/normal/low) can lower the caller's role
+    priority, never raise it; X-Deadline-Ms is the client's remaining
+    time budget.
+    Authenticated queries are saved to the caller's tenant history;
+    anonymous ones are answered but not persisted.
+    """
     session_id = str(uuid.uuid4())
     query = request.get("query", "")
     
     if not query:
         return {"error": "Query is required"},  400
     
+    tenant_context = await asyncio.to_thread(resolve_tenant_context, authorization)
+    if tenant_context and not tenant_context.has_permission("query_council"):
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    # The authenticated role caps priority; X-Council-Priority can only lower it
+    role_priority = (
+        HealthcareDomainConfig.get_role_priority(tenant_context.user_role) if tenant_context else None
+    )
+    priority = resolve_priority(role_priority, parse_priority(x_council_priority))
+    budget_seconds = settings.council_timeout_seconds
+    if x_deadline_ms is not None:
+        if x_deadline_ms <= 0:
+            raise HTTPException(status_code=504, detail="Request deadline already passed")
+        budget_seconds = min(budget_seconds, x_deadline_ms / 1000)
+    deadline = time.monotonic() + budget_seconds
+    
     # Stage 1: Get responses from all council members
     opinions = {}
-    async with httpx.AsyncClient() as client:
-        for member_id, member_config in COUNCIL_MEMBERS.items():
-            try:
-                response = await call_openrouter(
-                    client=client,
-                    model=member_config["model"],
-                    system_prompt=member_config["prompt"],
-                    user_message=query,
-                )
-                opinions[member_id] = {
-                    "role": member_config["role"],
-                    "model": member_config["model"],
-                    "response": response,
-                }
-            except Exception as e:
-                opinions[member_id] = {
-                    "role": member_config["role"],
-                    "error": str(e),
-                }
+    client = get_http_client()
+    scheduler = get_scheduler()
+    queue_wait_ms = 0.0
+    for member_id, member_config in COUNCIL_MEMBERS.items():
+        started = time.perf_counter()
+        try:
+            # Each call gets whatever budget is left rather than a fixed timeout
+            async with scheduler.slot(priority, deadline) as wait_ms:
+                queue_wait_ms += wait_ms
+                # httpx timeouts apply per read and restart on every streamed
+                # chunk, so bound the whole call by the remaining budget
+                try:
+                    response, usage = await asyncio.wait_for(
+                        call_openrouter(
+                            client=client,
+                            model=member_config["model"],
+                            system_prompt=member_config["prompt"],
+                            user_message=query,
+                            timeout=remaining_seconds(deadline),
+                        ),
+                        timeout=remaining_seconds(deadline),
+                    )
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded("Deadline passed during the upstream call")
+            opinions[member_id] = {
+                "role": member_config["role"],
+                "model": member_config["model"],
+                "response": response,
+                "usage": usage,
+            }
+        except Exception as e:
+            opinions[member_id] = {
+                "role": member_config["role"],
+                "model": member_config["model"],
+                "error": str(e),
+            }
+        opinions[member_id]["latency_ms"] = round((time.perf_counter() - started) * 1000)
     
-    return {
+    # Local agreement scoring - no LLM round trip; strong consensus lets the
+    # chairman synthesis stage be skipped when CONSENSUS_SKIP_SYNTHESIS is on
+    consensus = analyze_opinions(opinions)
+    
+    result = {
         "session_id": session_id,
         "query": query,
         "stage": "stage_1_complete",
         "council_opinions": opinions,
+        "consensus": consensus,
+        "synthesis_required": not (settings.consensus_skip_synthesis and consensus["strong_consensus"]),
+        "chairman_input": build_chairman_input(query, opinions, consensus),
+        "scheduling": {
+            "priority": priority,
+            "budget_ms": round(budget_seconds * 1000),
+            "queue_wait_ms": round(queue_wait_ms, 1),
+        },
         "timestamp": datetime.utcnow().isoformat(),
     }
 
-async def call_openrouter(client: httpx.AsyncClient, model: str, system_prompt: str, user_message: str):
-    """Call OpenRouter API"""
+    if not tenant_context:
+        return result
+
+    # Firestore client (and its first-use initialization) is blocking; keep
+    # it off the event loop
+    try:
+        result["query_id"] = await asyncio.to_thread(
+            lambda: get_firebase_service().save_council_query(
+                query, result,
+                tenant_id=tenant_context.tenant_id,
+                user_id=tenant_context.user_id,
+            )
+        )
+    except Exception as e:
+        logger.error(f"Failed to save council query: {e}")
+
+    return result
+
+@router.get("/api/council/history")
+@require_auth
+@require_permission("view_history")
+async def council_history(
+    request: Request,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+):
+    """List the caller's past council queries, newest first (cursor-paginated)"""
+    limit = max(1, min(limit, 100))
+    return await asyncio.to_thread(
+        lambda: get_firebase_service().list_council_queries(
+            tenant_id=request.state.tenant_id,
+            user_id=request.state.user_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    )
+
+@router.get("/api/council/analytics")
+@require_auth
+@require_permission("view_aggregated_analytics")
+async def council_analytics(
+    request: Request,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+):
+    """Daily query counts and per-model latency/error/cost from rollup documents"""
+    days = await asyncio.to_thread(
+        lambda: get_firebase_service().get_query_analytics(
+            tenant_id=request.state.tenant_id,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    )
+    return {"tenant_id": request.state.tenant_id, "days": days}
+
+async def call_openrouter(client: httpx.AsyncClient, model: str, system_prompt: str, user_message: str,
+                          timeout: float = settings.council_timeout_seconds):
+    """Call OpenRouter API, returning (content, usage)"""
     headers = {
-        "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
+        "Authorization": f"Bearer {settings.openrouter_api_key}",
         "HTTP-Referer": "https://mindlyhealth.io",
         "X-Title": "Mindly Chairman's Council",
     }
@@ -122,21 +273,84 @@ async def call_openrouter(client: httpx.AsyncClient, model: str, system_prompt:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
         ],
-        "max_tokens": settings.MAX_TOKENS_PER_RESPONSE,
+        "max_tokens": settings.max_tokens_per_response,
     }
     
-    response = await client.post(
-        f"{settings.OPENROUTER_BASE_URL}/chat/completions",
+    # Stream the body so oversized upstream responses are cut off rather than
+    # buffered whole, and error bodies only ever keep their first few KB
+    async with client.stream(
+        "POST",
+        f"{settings.openrouter_base_url}/chat/completions",
         headers=headers,
         json=payload,
-        timeout=settings.COUNCIL_TIMEOUT_SECONDS,
-    )
-    
-    if response.status_code != 200:
-        raise Exception(f"OpenRouter error: {response.text}")
+        timeout=timeout,
+    ) as response:
+        if response.status_code != 200:
+            body = await read_capped_body(response, settings.max_error_body_bytes, truncate=True)
+            raise Exception(f"OpenRouter error: {body.decode('utf-8', errors='replace')}")
+        body = await read_capped_body(response, settings.max_upstream_response_bytes)
     
-    result = response.json()
-    return result["choices"][0]["message"]["content"]
+    result = json_loads(body)
+    return result["choices"][0]["message"]["content"], result.get("usage", {})
+
+async def read_capped_body(response: httpx.Response, max_bytes: int, truncate: bool = False) -> bytes:
+    """Read a streamed response body, stopping at max_bytes.
+
+    Raises once the cap is exceeded, or returns the first max_bytes when truncate is set.
+    """
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) > max_bytes:
+            if truncate:
+                return bytes(body[:max_bytes]) + b"...[truncated]"
+            raise Exception(f"OpenRouter response exceeded {max_bytes} bytes")
+    return bytes(body)
+
+@router.get("/api/council/scheduler")
+@require_auth
+@require_permission("view_analytics")
+async def scheduler_stats(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+):
+    """Upstream queue depth and queue-wait time per priority class"""
+    return get_scheduler().stats()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the shared HTTP client on shutdown"""
+    yield
+    if _http_client is not None:
+        await _http_client.aclose()
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application.
+
+    Services (Firebase, the upstream HTTP client) are created lazily on first
+    use, so building the app does no network or credential work.
+    """
+    app = FastAPI(
+        title="Mindly Chairman's Council",
+        description="Multi-model AI advisory council for Mindly Health",
+        version="1.0.0",
+        default_response_class=DefaultJSONResponse,
+        lifespan=lifespan,
+    )
+
+    # Enable CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.include_router(router)
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,138 @@
+"""Priority scheduling and deadline handling for upstream model calls."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Priority classes, most urgent first
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = "normal"
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before its work can run."""
+
+
+def parse_priority(value: Optional[str]) -> Optional[str]:
+    """Normalize a client-supplied priority; None if missing or unknown."""
+    if value and value.strip().lower() in PRIORITY_CLASSES:
+        return value.strip().lower()
+    return None
+
+
+def resolve_priority(role_priority: Optional[str], requested: Optional[str]) -> str:
+    """Effective priority for a request.
+
+    The caller's role sets a ceiling (DEFAULT_PRIORITY for anonymous callers
+    and roles without one); a requested priority can only lower it.
+    """
+    ceiling = role_priority or DEFAULT_PRIORITY
+    if requested and PRIORITY_CLASSES[requested] > PRIORITY_CLASSES[ceiling]:
+        return requested
+    return ceiling
+
+
+def remaining_seconds(deadline: float) -> float:
+    """Seconds left until a time.monotonic() deadline (never negative)."""
+    return max(0.0, deadline - time.monotonic())
+
+
+class PriorityScheduler:
+    """Bounds concurrent upstream calls and admits waiters by priority.
+
+    Waiters are served most-urgent first, FIFO within a class. A waiter whose
+    deadline passes while queued is dropped with DeadlineExceeded instead of
+    taking a slot.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._stats = {
+            name: {"admitted": 0, "dropped": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            for name in PRIORITY_CLASSES
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: str, deadline: float) -> AsyncIterator[float]:
+        """Hold one upstream slot; yields the time spent queued, in ms."""
+        wait_ms = await self._acquire(priority, deadline)
+        try:
+            yield wait_ms
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: str, deadline: float) -> float:
+        started = time.monotonic()
+        stats = self._stats[priority]
+        if started >= deadline:
+            stats["dropped"] += 1
+            raise DeadlineExceeded("Deadline passed before the request was scheduled")
+
+        # Live waiters only exist while every slot is taken (_release hands
+        # slots over directly), so free capacity means nobody is ahead of us
+        if self.active < self.max_concurrency:
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            entry = (PRIORITY_CLASSES[priority], next(self._sequence), deadline, future)
+            heapq.heappush(self._waiters, entry)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout=remaining_seconds(deadline))
+            except DeadlineExceeded:
+                stats["dropped"] += 1
+                raise
+            except asyncio.TimeoutError:
+                if not future.done():
+                    future.cancel()
+                elif future.exception() is None:
+                    # Handed a slot just as the deadline hit; give it back
+                    self._release()
+                stats["dropped"] += 1
+                raise DeadlineExceeded("Deadline passed while queued for an upstream slot")
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled() and future.exception() is None:
+                    self._release()
+                raise
+
+        wait_ms = (time.monotonic() - started) * 1000
+        stats["admitted"] += 1
+        stats["wait_ms_total"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+        return wait_ms
+
+    def _release(self) -> None:
+        # Hand the slot straight to the most urgent live waiter, skipping
+        # any that were cancelled or whose deadline has already passed
+        while self._waiters:
+            _, _, deadline, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            if time.monotonic() >= deadline:
+                future.set_exception(DeadlineExceeded("Deadline passed while queued for an upstream slot"))
+                continue
+            future.set_result(None)
+            return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue-wait statistics per priority class."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": sum(1 for *_, future in self._waiters if not future.done()),
+            "priorities": {
+                name: {
+                    **stats,
+                    "wait_ms_avg": stats["wait_ms_total"] / stats["admitted"] if stats["admitted"] else 0.0,
+                }
+                for name, stats in self._stats.items()
+            },
+        }
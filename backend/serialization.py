@@ -0,0 +1,24 @@
+"""JSON encoding/decoding with optional orjson acceleration."""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+# orjson is optional - fall back to the standard library when missing
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Response class for the FastAPI app
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+def json_loads(data: bytes) -> Any:
+    """Decode a JSON document from raw bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,69 @@
+"""Cold-start import budget check.
+
+Imports the app in fresh interpreters and exits non-zero if the import takes
+longer than the budget, or if heavy SDKs that should be lazily imported get
+pulled in at import time.
+
+Usage: python startup_check.py [--budget-ms N] [--runs N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+
+# Modules that must only load on first use, never while importing the app
+LAZY_MODULES = ["firebase_admin", "grpc", "google.cloud.firestore"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"elapsed_ms": elapsed_ms, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure_import() -> dict:
+    """Import main in a fresh interpreter and report time and eagerly loaded modules."""
+    # K_SERVICE mirrors Cloud Run, so .env loading is skipped like in production
+    env = {**os.environ, "K_SERVICE": os.getenv("K_SERVICE", "startup-check")}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_check(budget_ms: float, runs: int) -> int:
+    samples = [measure_import() for _ in range(runs)]
+    # Best of N filters out noise from a cold disk cache
+    best_ms = min(sample["elapsed_ms"] for sample in samples)
+    eager = sorted({module for sample in samples for module in sample["loaded"]})
+
+    print(f"import main: best {best_ms:.0f} ms over {runs} runs (budget {budget_ms:.0f} ms)")
+    failed = False
+    if best_ms > budget_ms:
+        print(f"FAIL: import time exceeds budget by {best_ms - budget_ms:.0f} ms")
+        failed = True
+    if eager:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(run_check(args.budget_ms, args.runs))
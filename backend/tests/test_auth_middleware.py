@@ -0,0 +1,48 @@
+import pytest
+
+import auth_middleware
+from auth_middleware import AuthMiddleware, hash_api_key
+
+API_KEY = "sk-chairmancouncil-t1-u1-4f9c2b7e"
+
+
+class StubFirebaseService:
+    def __init__(self, users):
+        self.users = users
+
+    def get_tenant_config(self, tenant_id):
+        return {"organization_name": "Clinic", "default_role": "clinician"}
+
+    def get_user_config(self, tenant_id, user_id):
+        return self.users.get((tenant_id, user_id))
+
+
+@pytest.fixture
+def users(monkeypatch):
+    users = {("t1", "u1"): {"role": "researcher", "api_key_hash": hash_api_key(API_KEY)}}
+    service = StubFirebaseService(users)
+    monkeypatch.setattr(auth_middleware, "get_firebase_service", lambda: service)
+    return users
+
+
+def test_valid_key_resolves_stored_role(users):
+    verified = AuthMiddleware().verify_api_key(API_KEY)
+
+    assert verified["tenant_id"] == "t1"
+    assert verified["user_id"] == "u1"
+    assert verified["user_role"] == "researcher"
+
+
+@pytest.mark.parametrize("api_key", [
+    "sk-chairmancouncil-t1-u1",             # ids alone, no secret
+    "sk-chairmancouncil-t1-u1-guessed",     # wrong secret
+    "sk-chairmancouncil-t1-u2-4f9c2b7e",    # another user's id
+])
+def test_forged_keys_are_rejected(users, api_key):
+    assert AuthMiddleware().verify_api_key(api_key) is None
+
+
+def test_user_without_key_hash_is_rejected(users):
+    users[("t1", "u1")].pop("api_key_hash")
+
+    assert AuthMiddleware().verify_api_key(API_KEY) is None
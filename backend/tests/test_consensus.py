@@ -0,0 +1,49 @@
+from consensus import analyze_opinions, tokenize
+from config import settings
+
+AGREE = "We recommend starting sertraline at 25 mg with weekly monitoring."
+DISAGREE = "We do not recommend starting sertraline at 25 mg with weekly monitoring."
+
+
+def opinions(*responses):
+    return {
+        f"member_{i}": {"role": f"Member {i}", "response": response}
+        for i, response in enumerate(responses)
+    }
+
+
+def test_tokenize_marks_negated_clause():
+    assert tokenize("Do not start sertraline. Monitor weekly.") == [
+        "not", "not_start", "not_sertraline", "monitor", "weekly",
+    ]
+    assert "not_recommend" in tokenize("We don't recommend it")
+
+
+def test_contradicting_members_are_not_consensus(monkeypatch):
+    monkeypatch.setattr(settings, "consensus_skip_synthesis_threshold", 0.6)
+    analysis = analyze_opinions(opinions(AGREE, AGREE, DISAGREE, DISAGREE))
+
+    assert analysis["pairwise_agreement"]["member_0|member_1"] == 1.0
+    assert analysis["pairwise_agreement"]["member_0|member_2"] < 0.6
+    assert analysis["strong_consensus"] is False
+
+
+def test_agreeing_full_council_is_consensus(monkeypatch):
+    monkeypatch.setattr(settings, "consensus_skip_synthesis_threshold", 0.6)
+    analysis = analyze_opinions(opinions(AGREE, AGREE, AGREE))
+
+    assert analysis["strong_consensus"] is True
+
+
+def test_failed_member_blocks_consensus(monkeypatch):
+    monkeypatch.setattr(settings, "consensus_skip_synthesis_threshold", 0.6)
+    members = opinions(AGREE, AGREE)
+    members["member_2"] = {"role": "Member 2", "error": "OpenRouter error"}
+    analysis = analyze_opinions(members)
+
+    assert analysis["failed_members"] == ["member_2"]
+    assert analysis["strong_consensus"] is False
+
+
+def test_synthesis_skip_is_off_by_default():
+    assert settings.consensus_skip_synthesis is False
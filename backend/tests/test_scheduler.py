@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from scheduler import DEFAULT_PRIORITY, DeadlineExceeded, PriorityScheduler, resolve_priority
+
+
+@pytest.mark.parametrize("role_priority, requested, expected", [
+    ("low", "high", "low"),          # researcher cannot jump the queue
+    ("high", "low", "low"),          # clinician may volunteer to wait
+    ("high", None, "high"),
+    (None, "high", DEFAULT_PRIORITY),  # anonymous callers are capped
+    (None, "low", "low"),
+    (None, None, DEFAULT_PRIORITY),
+])
+def test_requested_priority_can_only_lower_role_priority(role_priority, requested, expected):
+    assert resolve_priority(role_priority, requested) == expected
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold(scheduler, name, priority, budget, admitted, seconds=0.01):
+    """Take a slot, record admission and keep it for a moment."""
+    async with scheduler.slot(priority, time.monotonic() + budget):
+        admitted.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_waiters_are_admitted_by_priority_and_expired_ones_dropped():
+    async def scenario():
+        scheduler = PriorityScheduler(max_concurrency=1)
+        admitted = []
+        holder = asyncio.create_task(hold(scheduler, "holder", "low", 1, admitted, seconds=0.1))
+        await asyncio.sleep(0)
+
+        tasks = {
+            "low": asyncio.create_task(hold(scheduler, "low", "low", 1, admitted)),
+            "expired": asyncio.create_task(hold(scheduler, "expired", "normal", 0.02, admitted)),
+            "cancelled": asyncio.create_task(hold(scheduler, "cancelled", "high", 1, admitted)),
+            "high": asyncio.create_task(hold(scheduler, "high", "high", 1, admitted)),
+        }
+        await asyncio.sleep(0.01)
+        tasks["cancelled"].cancel()
+
+        await holder
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return scheduler, admitted, dict(zip(tasks, results))
+
+    scheduler, admitted, results = run(scenario())
+
+    assert admitted == ["holder", "high", "low"]
+    assert isinstance(results["expired"], DeadlineExceeded)
+    assert isinstance(results["cancelled"], asyncio.CancelledError)
+    stats = scheduler.stats()
+    assert stats["priorities"]["normal"]["dropped"] == 1
+    assert stats["priorities"]["high"]["dropped"] == 0
+    assert stats["priorities"]["high"]["admitted"] == 1
+    assert stats["priorities"]["low"]["admitted"] == 2
+    assert stats["active"] == 0
+    assert stats["queued"] == 0
+
+
+def test_waiter_cancelled_after_handoff_passes_the_slot_on():
+    async def scenario():
+        scheduler = PriorityScheduler(max_concurrency=1)
+        admitted = []
+        release = asyncio.Event()
+        waiters = {}
+
+        async def holder():
+            async with scheduler.slot("normal", time.monotonic() + 1):
+                await release.wait()
+            # Leaving the slot handed it to "first"; cancel it in the same
+            # tick, before it resumes
+            waiters["first"].cancel()
+
+        holding = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiters["first"] = asyncio.create_task(hold(scheduler, "first", "high", 1, admitted))
+        second = asyncio.create_task(hold(scheduler, "second", "low", 1, admitted))
+        await asyncio.sleep(0.01)
+
+        release.set()
+        await holding
+        first = waiters["first"]
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        return scheduler, admitted, results
+
+    scheduler, admitted, results = run(scenario())
+
+    # Depending on the Python version, wait_for either surfaces the cancel or
+    # lets the already-granted slot be used; either way the slot is not leaked
+    if isinstance(results[0], asyncio.CancelledError):
+        assert admitted == ["second"]
+    else:
+        assert admitted == ["first", "second"]
+    assert scheduler.stats()["active"] == 0
+    assert scheduler.stats()["queued"] == 0
+
+
+def test_expired_deadline_is_dropped_before_queueing():
+    async def scenario():
+        scheduler = PriorityScheduler(max_concurrency=1)
+        with pytest.raises(DeadlineExceeded):
+            async with scheduler.slot("low", time.monotonic() - 1):
+                pass
+        return scheduler
+
+    scheduler = run(scenario())
+
+    assert scheduler.stats()["priorities"]["low"]["dropped"] == 1
+    assert scheduler.stats()["active"] == 0